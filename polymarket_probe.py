@@ -0,0 +1,419 @@
+import asyncio
+import httpx
+import orjson
+import threading
+import time
+import os
+import re
+import socket
+import functools
+import contextlib
+import contextvars
+import io
+import tempfile
+from pathlib import Path
+
+BASE_URL = "https://clob.polymarket.com"
+REQUEST_TIMEOUT = 10.0 # Seconds, applied to every probe on the shared AsyncClient (ClobClient uses its own)
+TIME_URL = f"{BASE_URL}/time"
+MARKETS_URL = f"{BASE_URL}/markets"
+BOOK_URL = f"{BASE_URL}/book"
+BOOKS_URL = f"{BASE_URL}/books"
+ORDER_URL = f"{BASE_URL}/order"
+# Gamma API is better for filtering active markets than CLOB
+GAMMA_URL = "https://gamma-api.polymarket.com/markets"
+GAMMA_PARAMS = {
+    "closed": "false",
+    "active": "true",
+    "limit": 5, # We stop at the first book found, so a handful of markets is enough
+    "order": "volume24hr", # Try to get high volume markets
+    "fields": "clobTokenIds,question,slug" # Only what we read; ignored if unsupported
+}
+# Classify signed-order errors in a single scan of the message; only the balance phrases ignore case
+AUTH_ERR_RE = re.compile(r"Unauthorized|Invalid api key")
+LOGIC_ERR_RE = re.compile(r"Invalid token|not found|Order validation failed|(?i:not enough balance|insufficient balance)")
+# Details (latencies, book tops, progress) only print with PM_VERBOSE=1; PASS/FAIL/WARN always print
+VERBOSE = os.environ.get("PM_VERBOSE") == "1"
+LATENCIES = {}
+LATENCIES_LOCK = threading.Lock() # Signed order runs in a worker thread
+# Per-test output buffer, so concurrently running tests don't interleave their lines; None means stdout
+OUTPUT = contextvars.ContextVar("OUTPUT", default=None)
+
+def report(*args):
+    print(*args, file=OUTPUT.get())
+
+# Resolve each hostname once per run; every later connection reuses the cached result
+_getaddrinfo = socket.getaddrinfo
+
+@functools.lru_cache(maxsize=32)
+def cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    return _getaddrinfo(host, port, family, type, proto, flags)
+
+@contextlib.contextmanager
+def dns_cache():
+    # Patched only for the duration of run_all(), starting from an empty cache, and restored after
+    original_getaddrinfo = socket.getaddrinfo
+    cached_getaddrinfo.cache_clear()
+    socket.getaddrinfo = cached_getaddrinfo
+    try:
+        yield
+    finally:
+        socket.getaddrinfo = original_getaddrinfo
+        cached_getaddrinfo.cache_clear()
+
+def record_latency(name, start_ns, end_ns=None):
+    # end_ns lets probes that finish before their result is consumed record their own end time
+    if end_ns is None:
+        end_ns = time.perf_counter_ns()
+    latency_ms = (end_ns - start_ns) / 1e6
+    with LATENCIES_LOCK:
+        LATENCIES[name] = latency_ms
+    return latency_ms
+
+async def probe_book(client, token_id):
+    start = time.perf_counter_ns()
+    try:
+        async with client.stream("GET", BOOK_URL, params={"token_id": token_id}) as resp:
+            # Only download the body of a found book; anything else is closed unread
+            if resp.status_code != 200:
+                return token_id, resp.status_code, None, start, time.perf_counter_ns()
+            book_data = orjson.loads(await resp.aread())
+            return token_id, resp.status_code, book_data, start, time.perf_counter_ns()
+    except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+        # Timeout, stream reset or a non-JSON 200 body: report it as a failed probe (no status)
+        # rather than raising, so it doesn't cancel the other probes
+        report(f"[WARN] Failed to read book for {token_id}: {e}")
+        return token_id, None, None, start, time.perf_counter_ns()
+
+async def first_book(client, token_ids):
+    # Probe every token concurrently and return the first book that comes back,
+    # cancelling the probes still in flight
+    tasks = [asyncio.create_task(probe_book(client, token_id)) for token_id in token_ids]
+    try:
+        for next_probe in asyncio.as_completed(tasks):
+            token_id, status_code, book_data, start, end = await next_probe
+            if status_code == 200:
+                return token_id, book_data, start, end
+            elif status_code is None or status_code == 404:
+                continue # Probe already warned, or empty book / not found
+            else:
+                report(f"[WARN] Failed to read book for {token_id}. Status: {status_code}")
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+def print_book(token_id, market, latency, book_data):
+    report(f"[PASS] Successfully read order book for token {token_id}")
+    if VERBOSE:
+        report(f"      Market: {market.get('question', market.get('slug', 'Unknown'))}")
+        report(f"      Latency: {latency:.2f} ms")
+        bids = book_data.get('bids', [])
+        asks = book_data.get('asks', [])
+        report(f"      Top Bid: {bids[0] if bids else 'None'}")
+        report(f"      Top Ask: {asks[0] if asks else 'None'}")
+
+async def test_connectivity(client):
+    report("Testing connectivity to Polymarket CLOB API...")
+    try:
+        # Untimed warmup pays for DNS + TCP + TLS, so the measured request reflects steady-state latency
+        await client.get(TIME_URL)
+        start = time.perf_counter_ns()
+        resp = await client.get(TIME_URL)
+        latency = record_latency("Connectivity (GET /time)", start)
+        
+        if resp.status_code == 200:
+            report(f"[PASS] Connected to {TIME_URL}. Server time: {resp.text[:80]}")
+            if VERBOSE:
+                report(f"      Latency: {latency:.2f} ms")
+            return True
+        else:
+            report(f"[FAIL] Connected but received status code: {resp.status_code}")
+            report(f"Response: {resp.text}")
+            return False
+    except Exception as e:
+        report(f"[FAIL] Could not connect to {TIME_URL}")
+        report(f"Error: {e}")
+        return False
+
+async def test_read_order_book(client):
+    report("\nTesting Read Order Book (Public API)...")
+    try:
+        # Strategy: Use Gamma API to find an active market, then check CLOB for the book.
+        
+        if VERBOSE:
+            report(f"[INFO] Fetching active markets from Gamma API ({GAMMA_URL})...")
+        resp = await client.get(GAMMA_URL, params=GAMMA_PARAMS)
+        
+        markets = []
+        if resp.status_code == 200:
+            markets = orjson.loads(resp.content)
+            # Gamma returns a list directly usually, or paginated
+            if isinstance(markets, dict) and 'data' in markets: # Handle potential pagination wrapper
+                markets = markets['data']
+        else:
+            report(f"[WARN] Gamma API failed ({resp.status_code}). Falling back to CLOB markets...")
+            # Fallback to original method if Gamma fails
+            resp = await client.get(MARKETS_URL, params={"limit": 50})
+            if resp.status_code == 200:
+                data = orjson.loads(resp.content)
+                markets = data.get('data', []) if isinstance(data, dict) else data
+
+        if not markets:
+            report("[FAIL] No markets found to test.")
+            return False
+
+        if VERBOSE:
+            report(f"[INFO] Found {len(markets)} markets. Checking for order books...")
+        
+        candidates = []
+        for market in markets:
+            # Extract token_id
+            token_id = None
+            
+            # Gamma structure
+            token_ids = market.get('clobTokenIds')
+            if token_ids:
+                # Either a JSON-encoded list or an already-decoded list; anything else has no usable ids
+                if isinstance(token_ids, str) and token_ids.startswith('['):
+                    try:
+                        token_ids = orjson.loads(token_ids)
+                    except orjson.JSONDecodeError:
+                        continue # Malformed ids only rule out this market
+                elif not isinstance(token_ids, list):
+                    token_ids = []
+                if token_ids:
+                    token_id = token_ids[0]
+            # CLOB structure
+            elif market.get('tokens'):
+                token_id = market['tokens'][0].get('token_id')
+            
+            if not token_id:
+                continue
+            candidates.append((token_id, market))
+
+        if not candidates:
+            report("[FAIL] Could not find any accessible order book in the fetched markets.")
+            return False
+
+        # Fetch every candidate book from CLOB in a single round-trip
+        start = time.perf_counter_ns()
+        books_resp = await client.post(BOOKS_URL, json=[{"token_id": token_id} for token_id, _ in candidates])
+        books = None
+        if books_resp.status_code == 200:
+            try:
+                books = orjson.loads(books_resp.content)
+            except orjson.JSONDecodeError:
+                pass
+            if not isinstance(books, list): # Error object or garbage instead of a list of books
+                report("[WARN] Unexpected bulk order book response. Falling back to single books...")
+                books = None
+        elif books_resp.status_code not in [404, 405]:
+            # e.g. one bad token id in the batch, rate limiting or a server error
+            report(f"[WARN] Failed to read books in bulk. Status: {books_resp.status_code}. Falling back to single books...")
+
+        if books is not None:
+            latency = record_latency("Read Order Book (POST /books)", start)
+            books_by_id = {book.get('asset_id'): book for book in books if isinstance(book, dict)}
+            for token_id, market in candidates:
+                book_data = books_by_id.get(token_id)
+                if book_data:
+                    print_book(token_id, market, latency, book_data)
+                    return True
+            report("[FAIL] Could not find any accessible order book in the fetched markets.")
+            return False
+
+        # Bulk read unavailable or failed: probe books one by one and take whichever answers first
+        found = await first_book(client, [token_id for token_id, _ in candidates])
+        if found:
+            token_id, book_data, start, end = found
+            latency = record_latency("Read Order Book (GET /book)", start, end)
+            print_book(token_id, dict(candidates)[token_id], latency, book_data)
+            return True
+
+        report("[FAIL] Could not find any accessible order book in the fetched markets.")
+        return False
+
+    except Exception as e:
+        report(f"[FAIL] Error reading order book: {e}")
+        return False
+
+async def test_place_order_unauth(client):
+    report("\nTesting Place Order Latency (POST /order)...")
+    # Always shown: it qualifies the PASS below as a reachability check, not a signed-auth check
+    report("[INFO] No PRIVATE_KEY found in environment. Using dummy data.")
+    # Unsigned dummy request: only checks that the order endpoint is reachable
+    payload = {
+        "token_id": "0",
+        "price": "0.5",
+        "size": "10",
+        "side": "BUY",
+        "expiration": 0,
+        "nonce": 0,
+        "signature": "0x0"
+    }
+    try:
+        start = time.perf_counter_ns()
+        resp = await client.post(ORDER_URL, json=payload)
+        latency = record_latency("Place Order (POST /order)", start)
+        
+        if resp.status_code in [400, 401, 422]:
+            report(f"[PASS] Order endpoint is reachable (Status: {resp.status_code}).")
+            if VERBOSE:
+                report(f"      Latency: {latency:.2f} ms")
+            return True
+        elif resp.status_code == 403:
+            report(f"[FAIL] Order endpoint returned 403 Forbidden.")
+            return False
+        else:
+            report(f"[WARN] Unexpected status code: {resp.status_code}")
+            return True
+    except Exception as e:
+        report(f"[FAIL] Error: {e}")
+        return False
+
+async def test_place_order_signed(client):
+    report("\nTesting Place Order Latency (POST /order)...")
+    # ClobClient is synchronous and owns its HTTP client, keep it off the event loop so the book probes still overlap
+    return await asyncio.to_thread(place_signed_order, os.getenv("PRIVATE_KEY"))
+
+def save_api_creds(creds_path, api_creds):
+    # Write to a fresh 0600 temp file (mkstemp never reuses an existing one) and swap it in,
+    # so an interrupted write never leaves a partial or world-readable cache
+    creds_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=creds_path.parent, prefix=creds_path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(api_creds.__dict__))
+        os.replace(tmp_path, creds_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def place_signed_order(private_key):
+    # Use ClobClient with Private Key
+    try:
+        # Imported lazily: py_clob_client pulls in the eth signing stack, which the dummy path never needs
+        from py_clob_client.client import ClobClient
+        from py_clob_client.clob_types import ApiCreds, OrderArgs, OrderType
+        from py_clob_client.constants import POLYGON
+
+        funder = os.getenv("FUNDER")
+        if VERBOSE:
+            report("[INFO] Initializing ClobClient with Private Key...")
+        # Initialize client with private key (L2 auth)
+        # Note: This might require creating an API key if one doesn't exist, 
+        # but ClobClient usually handles signing if key is provided.
+        client = ClobClient(
+            host=BASE_URL, 
+            key=private_key, 
+            chain_id=POLYGON,
+            signature_type=2,
+            funder=funder
+        )
+        # API creds are deterministic per key: derive them once, then reuse them from disk
+        creds_path = Path.home() / ".cache" / f"polymarket_creds_{client.get_address()}.json"
+        api_creds = None
+        if creds_path.exists():
+            try:
+                api_creds = ApiCreds(**orjson.loads(creds_path.read_bytes()))
+            except (OSError, orjson.JSONDecodeError, TypeError):
+                pass # Unreadable, empty or corrupt cache file: derive again and overwrite it below
+        if api_creds is None:
+            api_creds = client.create_or_derive_api_creds()
+            if api_creds is not None: # py_clob_client returns None when it can't parse the response
+                try:
+                    save_api_creds(creds_path, api_creds)
+                except OSError as e:
+                    report(f"[WARN] Could not cache API creds at {creds_path}: {e}")
+        client.set_api_creds(api_creds)
+        
+        # Create a dummy order args
+        # We use a token_id that likely doesn't exist or is invalid to avoid real trade
+        # But to test AUTH, we should use a valid structure.
+        # If we use a random token_id, the server might reject it with "Invalid token" 
+        # AFTER checking auth. This is what we want.
+        
+        order_args = OrderArgs(
+            price=0.5,
+            size=10,
+            side="BUY",
+            token_id="50488227317031565004575684525878022626020008256198844799050708993499540064859" # china taiwan 2027
+        )
+        
+        if VERBOSE:
+            report("[INFO] Sending signed order...")
+        start = time.perf_counter_ns()
+        try:
+            # create_order will sign and send
+            signed_order = client.create_order(order_args)
+            ## GTC(Good-Till-Cancelled) Order
+            resp = client.post_order(signed_order, OrderType.GTC)
+            latency = record_latency("Place Order (Signed)", start)
+            report(f"[PASS] Signed order sent successfully.")
+            if VERBOSE:
+                report(f"      Response: {resp}")
+                report(f"      Latency: {latency:.2f} ms")
+            return True
+        except Exception as e:
+            latency = record_latency("Place Order (Signed)", start)
+            # Check if error is related to Auth or Logic
+            err_str = str(e)
+            report(f"[INFO] API Response Error: {err_str}")
+            
+            if AUTH_ERR_RE.search(err_str):
+                # This means even with PK, auth failed. 
+                # Could be that we need to derive API keys first.
+                report("[FAIL] Authentication failed even with Private Key.")
+                report("      You may need to create an API key first using `client.create_api_key()`")
+                report(f"      If the cached creds are stale, delete {creds_path} to re-derive them.")
+                
+                # Attempt to create API key?
+                # print("      Attempting to create API key...")
+                # try:
+                #     api_creds = client.create_api_key()
+                #     print(f"      API Key Created: {api_creds}")
+                #     # Retry order?
+                # except Exception as k_err:
+                #     print(f"      Failed to create API key: {k_err}")
+                
+                return False
+            elif LOGIC_ERR_RE.search(err_str):
+                report(f"[PASS] Auth successful! Server rejected order logic (Expected).")
+                if VERBOSE:
+                    report(f"      Latency: {latency:.2f} ms")
+                return True
+            else:
+                report(f"[WARN] Unexpected error: {e}")
+                return False
+
+    except Exception as e:
+        report(f"[FAIL] Error using ClobClient: {e}")
+        return False
+
+async def run_buffered(test, client):
+    # Runs as its own task (and to_thread copies the context), so this buffer only sees this test's lines
+    buffer = io.StringIO()
+    OUTPUT.set(buffer)
+    ok = await test(client)
+    return ok, buffer.getvalue()
+
+async def run_all(test_place_order):
+    # One client for every probe: /time opens and warms the connection, then the
+    # book GETs and the order POST are multiplexed over the same TCP+TLS context.
+    # test_place_order is either test_place_order_unauth or test_place_order_signed.
+    limits = httpx.Limits(max_connections=10, keepalive_expiry=30)
+    with dns_cache():
+        async with httpx.AsyncClient(http2=True, limits=limits, timeout=REQUEST_TIMEOUT) as client:
+            c = await test_connectivity(client)
+            if not c:
+                return c, False, False
+            (r, book_output), (t, order_output) = await asyncio.gather(
+                run_buffered(test_read_order_book, client),
+                run_buffered(test_place_order, client),
+            )
+            # Each test's header and results are printed together, in a fixed order
+            print(book_output, end="")
+            print(order_output, end="")
+            return c, r, t